@@ -1,13 +1,25 @@
+import os
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.db import Base, engine
 from app.routers import auth, patients, ward, predict
 
 
-app = FastAPI(title="AI EHR Predictor MVP")
+# orjson serializes the list endpoints several times faster than stdlib json
+app = FastAPI(title="AI EHR Predictor MVP", default_response_class=ORJSONResponse)
+
+# The list payloads are full of repeating JSON keys and compress ~5x;
+# small responses skip compression entirely
+app.add_middleware(GZipMiddleware, minimum_size=500)
 
-# Create tables (dev only)
-Base.metadata.create_all(bind=engine)
+# Create tables (dev only). Set AUTO_CREATE_TABLES=0 in prod so N uvicorn
+# workers don't each replay CREATE TABLE round-trips on boot - use Alembic
+# migrations there instead.
+if os.getenv("AUTO_CREATE_TABLES", "1") == "1":
+    Base.metadata.create_all(bind=engine)
 
 
 @app.get("/health")
@@ -19,4 +31,4 @@ def health_check():
 app.include_router(auth.router)
 app.include_router(patients.router)
 app.include_router(ward.router)
-app.include_router(predict.router)
+app.include_router(predict.router)
@@ -1,78 +1,180 @@
-from datetime import date
-from app.models import Patient, Encounter
-
-def calculate_readmission_risk(patient: Patient, encounter: Encounter) -> tuple[float, str]:
-    """
-    Very simple rule-based risk calculator.
-    Later this will be replaced by a real ML model.
-    """
-
-    score = 0.0
-
-    # Age-based risk
-    if patient.birth_date:
-        today = date.today()
-        age = today.year - patient.birth_date.year - (
-            (today.month, today.day) < (patient.birth_date.month, patient.birth_date.day)
-        )
-        if age >= 75:
-            score += 0.4
-        elif age >= 65:
-            score += 0.3
-        elif age >= 50:
-            score += 0.2
-        else:
-            score += 0.1
-
-    # Length-of-stay based risk (if end_date known)
-    if encounter.start_date and encounter.end_date:
-        los = (encounter.end_date - encounter.start_date).days
-        if los >= 10:
-            score += 0.3
-        elif los >= 5:
-            score += 0.2
-        elif los >= 2:
-            score += 0.1
-
-    # Encounter type
-    if encounter.encounter_type == "IPD":
-        score += 0.2
-    elif encounter.encounter_type == "ER":
-        score += 0.1
-
-    # Clamp score between 0 and 1
-    score = max(0.0, min(1.0, score))
-
-    # Map to level
-    if score >= 0.7:
-        level = "high"
-    elif score >= 0.4:
-        level = "medium"
-    else:
-        level = "low"
-
-    return score, level
-
-
-from datetime import date
-from app.models import Patient, Encounter
-
-# existing calculate_readmission_risk...
-
-
-def calculate_los_risk(encounter: Encounter) -> tuple[int | None, str]:
-    """
-    Returns (length_of_stay_days, los_level)
-    los_level: "short", "medium", "long"
-    """
-    if not encounter.start_date or not encounter.end_date:
-        return None, "unknown"
-
-    los = (encounter.end_date - encounter.start_date).days
-    if los <= 1:
-        level = "short"
-    elif los <= 7:
-        level = "medium"
-    else:
-        level = "long"
-    return los, level
+from bisect import bisect_right
+from datetime import date
+
+import numpy as np
+
+from app.models import Patient, Encounter
+
+# Numba is optional: the batch kernel falls back to plain Python if it
+# is not installed (e.g. slim API-only deployments)
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:  # pragma: no cover
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+    prange = range
+
+# Encounter type codes for the numeric kernel (strings can't cross into nopython)
+ENCOUNTER_TYPE_CODES = {"IPD": 1, "ER": 2}
+
+# Lookup tables for the scalar path: bisect into a bin index instead of
+# walking the if/elif ladder. Index 0 covers unknown (negative) values.
+_AGE_BINS = (0, 50, 65, 75)
+_AGE_SCORES = (0.0, 0.1, 0.2, 0.3, 0.4)
+_LOS_BINS = (2, 5, 10)
+_LOS_SCORES = (0.0, 0.1, 0.2, 0.3)
+_TYPE_SCORES = {"IPD": 0.2, "ER": 0.1}
+
+
+@njit(cache=True, fastmath=True)
+def _score_kernel(age: int, los: int, enc_type_code: int) -> float:
+    """Numeric core of the rule-based scorer. age/los < 0 mean unknown."""
+    score = 0.0
+
+    if age >= 75:
+        score += 0.4
+    elif age >= 65:
+        score += 0.3
+    elif age >= 50:
+        score += 0.2
+    elif age >= 0:
+        score += 0.1
+
+    if los >= 10:
+        score += 0.3
+    elif los >= 5:
+        score += 0.2
+    elif los >= 2:
+        score += 0.1
+
+    if enc_type_code == 1:  # IPD
+        score += 0.2
+    elif enc_type_code == 2:  # ER
+        score += 0.1
+
+    return max(0.0, min(1.0, score))
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def _score_batch_kernel(ages, los_days, type_codes, scores):
+    for i in prange(len(ages)):
+        scores[i] = _score_kernel(ages[i], los_days[i], type_codes[i])
+
+
+def _score_batch_numpy(ages, los_days, type_codes) -> np.ndarray:
+    """NumPy version of the batch scorer: the branch ladder collapsed
+    into boolean masks so the whole batch is scored without a Python loop."""
+    score = np.where(
+        ages >= 75, 0.4,
+        np.where(ages >= 65, 0.3,
+                 np.where(ages >= 50, 0.2,
+                          np.where(ages >= 0, 0.1, 0.0)))
+    )
+    score = score + np.where(
+        los_days >= 10, 0.3,
+        np.where(los_days >= 5, 0.2,
+                 np.where(los_days >= 2, 0.1, 0.0))
+    )
+    score = score + np.where(
+        type_codes == 1, 0.2,
+        np.where(type_codes == 2, 0.1, 0.0)
+    )
+    return np.clip(score, 0.0, 1.0)
+
+
+def score_encounters_batch(ages, los_days, type_codes) -> np.ndarray:
+    """
+    Score many encounters at once (used by batch recompute paths).
+
+    Takes int64 arrays of ages, lengths of stay and encounter type codes
+    (-1 for unknown values) and returns a float64 array of risk scores.
+    """
+    ages = np.asarray(ages, dtype=np.int64)
+    los_days = np.asarray(los_days, dtype=np.int64)
+    type_codes = np.asarray(type_codes, dtype=np.int64)
+    if not _HAS_NUMBA:
+        return _score_batch_numpy(ages, los_days, type_codes)
+    scores = np.empty(len(ages), dtype=np.float64)
+    _score_batch_kernel(ages, los_days, type_codes, scores)
+    return scores
+
+
+def risk_levels_for_scores(scores) -> np.ndarray:
+    """Vectorized counterpart of risk_level_for_score."""
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.select([scores >= 0.7, scores >= 0.4], ["high", "medium"], default="low")
+
+
+def risk_level_for_score(score: float) -> str:
+    if score >= 0.7:
+        return "high"
+    elif score >= 0.4:
+        return "medium"
+    return "low"
+
+
+def calculate_readmission_risk(patient: Patient, encounter: Encounter) -> tuple[float, str]:
+    """
+    Very simple rule-based risk calculator.
+    Later this will be replaced by a real ML model.
+    """
+
+    # Age-based risk (age < 0 means unknown). Prefer the materialized
+    # age_years column and only fall back to date math when it is absent.
+    # ORM patients expose dob; older callers pass objects with birth_date.
+    age = -1
+    birth = getattr(patient, "birth_date", None) or getattr(patient, "dob", None)
+    if getattr(patient, "age_years", None) is not None:
+        age = patient.age_years
+    elif birth:
+        today = date.today()
+        age = today.year - birth.year - (
+            (today.month, today.day) < (birth.month, birth.day)
+        )
+
+    # Length-of-stay based risk (if discharge known); same admit/discharge
+    # vs start/end fallback as calculate_los_risk below
+    los = -1
+    start = getattr(encounter, "start_date", None) or getattr(encounter, "admit_date", None)
+    end = getattr(encounter, "end_date", None) or getattr(encounter, "discharge_date", None)
+    if start and end:
+        los = (end - start).days
+
+    score = (
+        _AGE_SCORES[bisect_right(_AGE_BINS, age)]
+        + _LOS_SCORES[bisect_right(_LOS_BINS, los)]
+        + _TYPE_SCORES.get(getattr(encounter, "encounter_type", None), 0.0)
+    )
+    score = max(0.0, min(1.0, score))
+    return score, risk_level_for_score(score)
+
+
+
+def calculate_los_risk(encounter: Encounter) -> tuple[int | None, str]:
+    """
+    Returns (length_of_stay_days, los_level)
+    los_level: "short", "medium", "long"
+    """
+    # ORM encounters use admit_date/discharge_date; older callers (and the
+    # tests) pass objects with start_date/end_date
+    start = getattr(encounter, "start_date", None) or getattr(encounter, "admit_date", None)
+    end = getattr(encounter, "end_date", None) or getattr(encounter, "discharge_date", None)
+    if not start or not end:
+        return None, "unknown"
+
+    los = (end - start).days
+    if los <= 1:
+        level = "short"
+    elif los <= 7:
+        level = "medium"
+    else:
+        level = "long"
+    return los, level
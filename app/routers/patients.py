@@ -1,33 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-
-from app.models import Patient, User
-from app.schemas import PatientOut
-from app.services.security import get_db, require_role, log_action
-
-router = APIRouter(prefix="/patients", tags=["patients"])
-
-
-@router.get("", response_model=list[PatientOut])
-def list_patients(
-    db: Session = Depends(get_db),
-    user: User = Depends(require_role(["nurse", "doctor", "admin"])),
-):
-    log_action(db, user, "LIST_PATIENTS", details=None)
-    patients = db.query(Patient).all()
-    db.commit()
-    return patients
-
-
-@router.get("/{patient_id}", response_model=PatientOut)
-def get_patient(
-    patient_id: int,
-    db: Session = Depends(get_db),
-    user: User = Depends(require_role(["nurse", "doctor", "admin"])),
-):
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    log_action(db, user, "VIEW_PATIENT", details=f"patient_id={patient_id}")
-    db.commit()
-    return patient
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import Patient, User
+from app.schemas import PatientOut
+from app.services.security import get_db, require_clinician, log_action
+
+router = APIRouter(prefix="/patients", tags=["patients"])
+
+# Compiled once at import; per-request validation/serialization then runs
+# entirely in pydantic-core instead of FastAPI's per-item response_model path
+PatientItem = TypeAdapter(PatientOut)
+
+
+@router.get("")
+def list_patients(
+    db: Session = Depends(get_db),
+    user: User = Depends(require_clinician),
+):
+    log_action(db, user, "LIST_PATIENTS", details=None)
+
+    def stream_patients():
+        # Dedicated session: the request-scoped one is torn down before the
+        # streamed body finishes sending
+        session = SessionLocal()
+        try:
+            yield b"["
+            first = True
+            for patient in session.query(Patient).yield_per(500):
+                if not first:
+                    yield b","
+                first = False
+                yield PatientItem.dump_json(
+                    PatientItem.validate_python(patient, from_attributes=True)
+                )
+            yield b"]"
+        finally:
+            session.close()
+
+    return StreamingResponse(stream_patients(), media_type="application/json")
+
+
+@router.get("/{patient_id}", response_model=PatientOut)
+def get_patient(
+    patient_id: int,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_clinician),
+):
+    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    log_action(db, user, "VIEW_PATIENT", details=f"patient_id={patient_id}")
+    return patient
@@ -1,13 +1,45 @@
 # app/routers/predict.py
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.db import get_db
-from app.models import Encounter
-from app.services.ml_predictor import predictor
+from app.db import engine, get_db
+from app.models import Encounter, Task
+from app.services.ml_predictor import get_predictor
+from app.services.security import get_current_user
 from pydantic import BaseModel
 
+# ON CONFLICT DO NOTHING exists on both backends but lives in dialect modules
+if engine.dialect.name == "sqlite":
+    from sqlalchemy.dialects.sqlite import insert as upsert
+else:
+    from sqlalchemy.dialects.postgresql import insert as upsert
+
 router = APIRouter(prefix="/predict", tags=["Predictions"])
 
+# The 15 ML feature columns in the order the model expects
+FEATURE_COLUMNS = [
+    "age_years_cleaned",
+    "gender_M",
+    "los_days",
+    "previous_admissions",
+    "days_since_last_admit",
+    "diagnosis_count",
+    "charlson_score",
+    "procedure_count",
+    "icu_stay_count",
+    "icu_los_days",
+    "admit_type_EMERGENCY",
+    "admit_type_URGENT",
+    "insurance_Medicare",
+    "insurance_Private",
+    "hospital_expire_flag",
+]
+
+
+def encounter_features(encounter: Encounter) -> dict:
+    """Extract the 15 ML features from an encounter row"""
+    return {name: getattr(encounter, name) for name in FEATURE_COLUMNS}
+
 class ReadmissionPrediction(BaseModel):
     encounter_id: int
     risk_score: float
@@ -15,40 +47,44 @@ class ReadmissionPrediction(BaseModel):
     risk_factors: list
 
 @router.get("/readmission/{encounter_id}", response_model=ReadmissionPrediction)
-def predict_readmission(encounter_id: int, db: Session = Depends(get_db)):
+def predict_readmission(
+    encounter_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
     """
     Predict 30-day readmission risk using XGBoost + SHAP explanations
     """
-    # Fetch encounter
-    encounter = db.query(Encounter).filter(Encounter.encounter_id == encounter_id).first()
+    # Fetch encounter by primary key - db.get() hits the identity map first
+    # and skips building/compiling a fresh SELECT
+    encounter = db.get(Encounter, encounter_id)
     if not encounter:
         raise HTTPException(status_code=404, detail="Encounter not found")
     
     # Prepare feature dict (15 features in correct order)
-    features = {
-        "age_years_cleaned": encounter.age_years_cleaned,
-        "gender_M": encounter.gender_M,
-        "los_days": encounter.los_days,
-        "previous_admissions": encounter.previous_admissions,
-        "days_since_last_admit": encounter.days_since_last_admit,
-        "diagnosis_count": encounter.diagnosis_count,
-        "charlson_score": encounter.charlson_score,
-        "procedure_count": encounter.procedure_count,
-        "icu_stay_count": encounter.icu_stay_count,
-        "icu_los_days": encounter.icu_los_days,
-        "admit_type_EMERGENCY": encounter.admit_type_EMERGENCY,
-        "admit_type_URGENT": encounter.admit_type_URGENT,
-        "insurance_Medicare": encounter.insurance_Medicare,
-        "insurance_Private": encounter.insurance_Private,
-        "hospital_expire_flag": encounter.hospital_expire_flag
-    }
-    
+    features = encounter_features(encounter)
+
     # Predict with XGBoost
-    prediction = predictor.predict(features)
+    prediction = get_predictor().predict(features)
     
     # Update encounter risk in DB
     encounter.risk_score = prediction["risk_score"]
     encounter.risk_level = prediction["risk_level"]
+
+    # Auto-create a nurse review task for high-risk patients; the partial
+    # unique index makes this a single round-trip with no existence check
+    if prediction["risk_level"] == "high":
+        db.execute(
+            upsert(Task)
+            .values(
+                patient_id=encounter.patient_id,
+                encounter_id=encounter.encounter_id,
+                task_type="nurse_review",
+                status="open",
+            )
+            .on_conflict_do_nothing()
+        )
+
     db.commit()
     
     return {
@@ -56,37 +92,75 @@ def predict_readmission(encounter_id: int, db: Session = Depends(get_db)):
         **prediction
     }
 
+class BatchPredictionRequest(BaseModel):
+    encounter_ids: list[int]
+
+
+@router.post("/readmission/batch", response_model=list[ReadmissionPrediction])
+def predict_readmission_batch(
+    payload: BatchPredictionRequest,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    Predict readmission risk for several encounters in one XGBoost/SHAP call
+    """
+    encounters = (
+        db.query(Encounter)
+        .filter(Encounter.encounter_id.in_(payload.encounter_ids))
+        .all()
+    )
+    by_id = {enc.encounter_id: enc for enc in encounters}
+    missing = [eid for eid in payload.encounter_ids if eid not in by_id]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Encounters not found: {missing}")
+
+    ordered = [by_id[eid] for eid in payload.encounter_ids]
+    predictions = get_predictor().predict_many(
+        [encounter_features(enc) for enc in ordered]
+    )
+
+    for enc, prediction in zip(ordered, predictions):
+        enc.risk_score = prediction["risk_score"]
+        enc.risk_level = prediction["risk_level"]
+    db.commit()
+
+    return [
+        {"encounter_id": enc.encounter_id, **prediction}
+        for enc, prediction in zip(ordered, predictions)
+    ]
+
+
 @router.post("/batch/recompute")
-def recompute_all_risks(db: Session = Depends(get_db)):
+def recompute_all_risks(db: Session = Depends(get_db), user=Depends(get_current_user)):
     """
     Recompute risk scores for all encounters (run after model update)
     """
-    encounters = db.query(Encounter).all()
-    updated = 0
-    
-    for encounter in encounters:
-        features = {
-            "age_years_cleaned": encounter.age_years_cleaned,
-            "gender_M": encounter.gender_M,
-            "los_days": encounter.los_days,
-            "previous_admissions": encounter.previous_admissions,
-            "days_since_last_admit": encounter.days_since_last_admit,
-            "diagnosis_count": encounter.diagnosis_count,
-            "charlson_score": encounter.charlson_score,
-            "procedure_count": encounter.procedure_count,
-            "icu_stay_count": encounter.icu_stay_count,
-            "icu_los_days": encounter.icu_los_days,
-            "admit_type_EMERGENCY": encounter.admit_type_EMERGENCY,
-            "admit_type_URGENT": encounter.admit_type_URGENT,
-            "insurance_Medicare": encounter.insurance_Medicare,
-            "insurance_Private": encounter.insurance_Private,
-            "hospital_expire_flag": encounter.hospital_expire_flag
-        }
-        
-        prediction = predictor.predict(features)
-        encounter.risk_score = prediction["risk_score"]
-        encounter.risk_level = prediction["risk_level"]
-        updated += 1
-    
+    # Stack all features into one (N, 15) matrix and predict in a single
+    # XGBoost call instead of one predict per row
+    encounter_ids = []
+    feature_rows = []
+    for encounter in db.query(Encounter).yield_per(10_000):
+        encounter_ids.append(encounter.encounter_id)
+        feature_rows.append([getattr(encounter, name) for name in FEATURE_COLUMNS])
+
+    if not encounter_ids:
+        return {"status": "success", "updated_encounters": 0}
+
+    risk_scores, risk_levels = get_predictor().predict_batch(
+        np.asarray(feature_rows, dtype=np.float32)
+    )
+
+    db.bulk_update_mappings(
+        Encounter,
+        [
+            {
+                "encounter_id": encounter_id,
+                "risk_score": float(score),
+                "risk_level": level,
+            }
+            for encounter_id, score, level in zip(encounter_ids, risk_scores, risk_levels)
+        ],
+    )
     db.commit()
-    return {"status": "success", "updated_encounters": updated}
+    return {"status": "success", "updated_encounters": len(encounter_ids)}
@@ -1,131 +1,164 @@
-# app/routers/ward.py
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
-
-from app.models import Patient, Encounter, Task
-from app.services.security import get_db, get_current_user, log_action
-
-router = APIRouter(prefix="/ward", tags=["ward"])
-
-@router.get("/risk")
-def ward_risk(
-    min_level: Optional[str] = Query(None, description="Filter by minimum risk level"),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
-):
-    """Get ward risk board - all patients with their latest encounter risk scores"""
-    
-    log_action(db, user, "VIEW_WARD", details=f"min_level={min_level}")
-    
-    # Query encounters with patient info
-    query = (
-        db.query(
-            Encounter.encounter_id,
-            Encounter.patient_id,
-            Patient.first_name,
-            Patient.last_name,
-            Encounter.risk_score,
-            Encounter.risk_level,
-        )
-        .join(Patient, Patient.patient_id == Encounter.patient_id)
-        .filter(Encounter.risk_score.isnot(None))
-    )
-    
-    # Apply risk filter
-    if min_level:
-        level_order = {"low": 1, "medium": 2, "high": 3}
-        if min_level in level_order:
-            min_value = level_order[min_level]
-            valid_levels = [k for k, v in level_order.items() if v >= min_value]
-            query = query.filter(Encounter.risk_level.in_(valid_levels))
-    
-    # Order by risk score descending
-    query = query.order_by(Encounter.risk_score.desc())
-    
-    results = query.all()
-    
-    # Format response
-    patients = []
-    for row in results:
-        patients.append({
-            "encounter_id": row.encounter_id,
-            "patient_id": row.patient_id,
-            "first_name": row.first_name,
-            "last_name": row.last_name,
-            "risk_score": float(row.risk_score) if row.risk_score else 0.0,
-            "risk_level": row.risk_level or "unknown",
-        })
-    
-    return patients
-
-
-@router.get("/tasks")
-def list_tasks(
-    status_filter: Optional[str] = Query(None, description="Filter by status: open, completed, or all"),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
-):
-    """List all tasks for the nurse"""
-    
-    log_action(db, user, "LIST_TASKS", details=f"status_filter={status_filter}")
-    
-    # Query tasks
-    query = db.query(Task)
-    
-    if status_filter and status_filter != "All":
-        query = query.filter(Task.status == status_filter)
-    
-    # Order by created_at desc
-    tasks = query.order_by(Task.created_at.desc()).all()
-    
-    # Format response
-    result = []
-    for task in tasks:
-        result.append({
-            "task_id": task.task_id,
-            "patient_id": task.patient_id,
-            "encounter_id": task.encounter_id,
-            "task_type": task.task_type,
-            "status": task.status,
-            "created_at": task.created_at.isoformat() if task.created_at else None,
-            "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-        })
-    
-    return result
-
-
-@router.post("/tasks/{task_id}/complete")
-def complete_task(
-    task_id: int,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
-):
-    """Mark a task as completed"""
-    
-    task = db.query(Task).filter(Task.task_id == task_id).first()
-    
-    if not task:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    if task.status == "completed":
-        from fastapi import HTTPException
-        raise HTTPException(status_code=400, detail="Task already completed")
-    
-    # Update task
-    from datetime import datetime
-    task.status = "completed"
-    task.completed_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(task)
-    
-    log_action(db, user, "COMPLETE_TASK", details=f"task_id={task_id}")
-    
-    return {
-        "task_id": task.task_id,
-        "status": task.status,
-        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
-    }
+# app/routers/ward.py
+import orjson
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from typing import Optional
+
+from pydantic import TypeAdapter
+
+from app.db import SessionLocal
+from app.models import Patient, Encounter, Task
+from app.risk import calculate_los_risk
+from app.schemas import WardPatientOut
+from app.services.security import get_db, get_current_user, log_action
+
+router = APIRouter(prefix="/ward", tags=["ward"])
+
+# One compiled validator for the whole list - validates and serializes the
+# page in a single pydantic-core call instead of per-row Python casts
+_WARD_RISK_LIST = TypeAdapter(list[WardPatientOut])
+
+# Ordering used to translate a minimum risk level into a SQL IN clause
+RISK_LEVEL_ORDER = {"low": 1, "medium": 2, "high": 3}
+
+# min_level -> levels at or above it, computed once at import instead of
+# rebuilding the list on every request
+LEVELS_AT_OR_ABOVE = {
+    level: tuple(k for k, v in RISK_LEVEL_ORDER.items() if v >= value)
+    for level, value in RISK_LEVEL_ORDER.items()
+}
+
+@router.get("/risk")
+def ward_risk(
+    min_level: Optional[str] = Query(None, description="Filter by minimum risk level"),
+    limit: int = Query(50, ge=1, le=500, description="Max rows per page"),
+    offset: int = Query(0, ge=0, description="Rows to skip"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Get ward risk board - all patients with their latest encounter risk scores"""
+    
+    log_action(db, user, "VIEW_WARD", details=f"min_level={min_level}")
+
+    # One statement: encounters with their patients joined in, so the row
+    # loop below never goes back to the database
+    query = (
+        db.query(Encounter)
+        .options(joinedload(Encounter.patient))
+        .filter(Encounter.risk_score.isnot(None))
+    )
+
+    # Apply risk filter in SQL so discarded rows never leave the database
+    if min_level in LEVELS_AT_OR_ABOVE:
+        query = query.filter(Encounter.risk_level.in_(LEVELS_AT_OR_ABOVE[min_level]))
+
+    # Order by risk score descending (index-backed) and page server-side so
+    # a worker never materializes more rows than one screen needs
+    query = (
+        query.order_by(Encounter.risk_score.desc().nullslast())
+        .offset(offset)
+        .limit(limit)
+    )
+
+    results = query.all()
+
+    # Format response: pydantic-core does the casting and defaulting in one
+    # pass over the list instead of per-field float()/or in Python
+    patients = []
+    for enc in results:
+        los_days, los_level = calculate_los_risk(enc)
+        patients.append({
+            "encounter_id": enc.encounter_id,
+            "patient_id": enc.patient_id,
+            "first_name": enc.patient.first_name if enc.patient else None,
+            "last_name": enc.patient.last_name if enc.patient else None,
+            "risk_score": enc.risk_score,
+            "risk_level": enc.risk_level,
+            "los_days": los_days,
+            "los_level": los_level,
+        })
+
+    return _WARD_RISK_LIST.dump_python(
+        _WARD_RISK_LIST.validate_python(patients), mode="json"
+    )
+
+
+@router.get("/tasks")
+def list_tasks(
+    status_filter: Optional[str] = Query(None, description="Filter by status: open, completed, or all"),
+    limit: int = Query(100, ge=1, le=500, description="Max rows per page"),
+    offset: int = Query(0, ge=0, description="Rows to skip"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """List all tasks for the nurse"""
+    
+    log_action(db, user, "LIST_TASKS", details=f"status_filter={status_filter}")
+
+    def stream_tasks():
+        # Dedicated session: the request-scoped one is torn down before the
+        # streamed body finishes sending
+        session = SessionLocal()
+        try:
+            query = session.query(Task)
+            if status_filter and status_filter != "All":
+                query = query.filter(Task.status == status_filter)
+
+            yield b"["
+            first = True
+            query = query.order_by(Task.created_at.desc()).offset(offset).limit(limit)
+            for task in query.yield_per(500):
+                if not first:
+                    yield b","
+                first = False
+                yield orjson.dumps({
+                    "task_id": task.task_id,
+                    "patient_id": task.patient_id,
+                    "encounter_id": task.encounter_id,
+                    "task_type": task.task_type,
+                    "status": task.status,
+                    "created_at": task.created_at.isoformat() if task.created_at else None,
+                    "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+                })
+            yield b"]"
+        finally:
+            session.close()
+
+    return StreamingResponse(stream_tasks(), media_type="application/json")
+
+
+@router.post("/tasks/{task_id}/complete")
+def complete_task(
+    task_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Mark a task as completed"""
+    
+    task = db.query(Task).filter(Task.task_id == task_id).first()
+    
+    if not task:
+        from fastapi import HTTPException
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    if task.status == "completed":
+        from fastapi import HTTPException
+        raise HTTPException(status_code=400, detail="Task already completed")
+    
+    # Update task
+    from datetime import datetime
+    task.status = "completed"
+    task.completed_at = datetime.utcnow()
+    
+    db.commit()
+    db.refresh(task)
+    
+    log_action(db, user, "COMPLETE_TASK", details=f"task_id={task_id}")
+    
+    return {
+        "task_id": task.task_id,
+        "status": task.status,
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+    }
@@ -0,0 +1,61 @@
+# app/services/audit.py
+# Deferred audit logging: entries are queued in-process and bulk-inserted by
+# a background thread so the request path never pays for an INSERT/commit.
+import atexit
+import queue
+import threading
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import AuditLog
+
+_audit_queue: queue.SimpleQueue = queue.SimpleQueue()
+_AUDIT_FLUSH_INTERVAL = 5.0  # seconds
+_AUDIT_BATCH_MAX = 200
+
+
+def log_action(db: Session, user, action: str, resource: str = None, details: str = None):
+    """Queue an audit entry for the background flusher"""
+    _audit_queue.put({
+        "user_id": getattr(user, "id", None),
+        "action": action,
+        "resource": resource,
+        "details": details,
+    })
+
+
+def flush_audit_queue() -> int:
+    """Drain queued entries into audit_logs with one executemany INSERT"""
+    entries = []
+    try:
+        while len(entries) < _AUDIT_BATCH_MAX:
+            entries.append(_audit_queue.get_nowait())
+    except queue.Empty:
+        pass
+
+    if not entries:
+        return 0
+
+    session = SessionLocal()
+    try:
+        session.execute(insert(AuditLog), entries)
+        session.commit()
+    finally:
+        session.close()
+    return len(entries)
+
+
+def _audit_worker():
+    while True:
+        time.sleep(_AUDIT_FLUSH_INTERVAL)
+        try:
+            flush_audit_queue()
+        except Exception:
+            pass  # never let audit flushing take the worker down
+
+
+threading.Thread(target=_audit_worker, daemon=True, name="audit-log-flusher").start()
+atexit.register(flush_audit_queue)
@@ -2,6 +2,7 @@
 import pickle
 import numpy as np
 import os
+from functools import lru_cache
 from pathlib import Path
 
 class ReadmissionPredictor:
@@ -17,14 +18,26 @@ class ReadmissionPredictor:
         try:
             with open(self.model_dir / "xgboost_readmission.pkl", "rb") as f:
                 self.model = pickle.load(f)
-            
-            with open(self.model_dir / "shap_explainer.pkl", "rb") as f:
-                self.explainer = pickle.load(f)
-            
+
+            # Build a TreeExplainer from the model instead of unpickling
+            # shap_explainer.pkl: tree_path_dependent uses XGBoost's built-in
+            # TreeSHAP (no background data), so per-call SHAP stays in C++
+            import shap
+            self.explainer = shap.TreeExplainer(
+                self.model, feature_perturbation="tree_path_dependent"
+            )
+
             import json
             with open(self.model_dir / "feature_names.json", "r") as f:
                 self.feature_names = json.load(f)
             
+            # Display names as a parallel array, formatted once at load so
+            # the per-request path just indexes by position
+            self._display_names = np.array(
+                [self._format_feature_name(n) for n in self.feature_names],
+                dtype=object,
+            )
+
             print(f"✅ Loaded XGBoost model with {len(self.feature_names)} features")
         except Exception as e:
             print(f"❌ Error loading model: {e}")
@@ -44,45 +57,100 @@ class ReadmissionPredictor:
                 "risk_factors": [{"feature": str, "impact": float, "value": float}]
             }
         """
-        # Extract features in correct order
-        feature_vector = [encounter_features[feat] for feat in self.feature_names]
-        feature_array = np.array(feature_vector).reshape(1, -1)
-        
+        # Per-call float32 row, built without a float64 intermediate.
+        # Sync endpoints run in the AnyIO threadpool against this one
+        # cached predictor, so a shared buffer here would race.
+        feature_array = np.fromiter(
+            (encounter_features[f] for f in self.feature_names),
+            dtype=np.float32,
+            count=len(self.feature_names),
+        ).reshape(1, -1)
+
         # Predict probability
         risk_prob = self.model.predict_proba(feature_array)[0][1]
-        
+
         # Determine risk level
-        if risk_prob >= 0.15:
-            risk_level = "high"
-        elif risk_prob >= 0.08:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
+        risk_level = self._risk_level(risk_prob)
+
         # Calculate SHAP values for explanation
         shap_values = self.explainer.shap_values(feature_array)[0]
-        
-        # Get top 5 risk factors
-        shap_importance = [(self.feature_names[i], shap_values[i], feature_vector[i]) 
-                          for i in range(len(shap_values))]
-        shap_importance.sort(key=lambda x: abs(x[1]), reverse=True)
-        
-        risk_factors = [
-            {
-                "feature": self._format_feature_name(feat),
-                "impact": float(impact),
-                "value": float(val),
-                "direction": "increases" if impact > 0 else "decreases"
-            }
-            for feat, impact, val in shap_importance[:5]
-        ]
-        
+
+        risk_factors = self._top_risk_factors(shap_values, feature_array[0])
+
         return {
             "risk_score": float(risk_prob),
             "risk_level": risk_level,
             "risk_factors": risk_factors
         }
-    
+
+    def predict_many(self, encounter_features_list: list) -> list:
+        """
+        Predict readmission risk (with SHAP explanations) for many encounters
+        using one XGBoost call and one SHAP call
+
+        Args:
+            encounter_features_list: list of dicts with 15 feature values each
+
+        Returns:
+            list of prediction dicts in input order (same shape as predict())
+        """
+        arr = np.asarray(
+            [[d[f] for f in self.feature_names] for d in encounter_features_list],
+            dtype=np.float32,
+        )
+        risk_probs = self.model.predict_proba(arr)[:, 1]
+        shap_matrix = self.explainer.shap_values(arr)
+
+        return [
+            {
+                "risk_score": float(risk_probs[i]),
+                "risk_level": self._risk_level(risk_probs[i]),
+                "risk_factors": self._top_risk_factors(shap_matrix[i], arr[i]),
+            }
+            for i in range(len(encounter_features_list))
+        ]
+
+    def _top_risk_factors(self, shap_values, feature_vector, k: int = 5) -> list:
+        """Top-k risk factors: O(n) argpartition on the ndarray instead of
+        building and fully sorting a Python tuple list"""
+        abs_sv = np.abs(shap_values)
+        k = min(k, len(shap_values))
+        top_idx = np.argpartition(abs_sv, -k)[-k:]
+        top_idx = top_idx[np.argsort(-abs_sv[top_idx])]
+
+        return [
+            {
+                "feature": self._display_names[i],
+                "impact": float(shap_values[i]),
+                "value": float(feature_vector[i]),
+                "direction": "increases" if shap_values[i] > 0 else "decreases"
+            }
+            for i in top_idx
+        ]
+
+    def _risk_level(self, risk_prob: float) -> str:
+        if risk_prob >= 0.15:
+            return "high"
+        elif risk_prob >= 0.08:
+            return "medium"
+        return "low"
+
+    def predict_batch(self, feature_matrix) -> tuple[np.ndarray, list]:
+        """
+        Predict readmission risk for many encounters in one XGBoost call
+        (no SHAP explanations - used by batch recompute)
+
+        Args:
+            feature_matrix: array-like of shape (n_encounters, 15)
+
+        Returns:
+            (risk_scores, risk_levels) - float array and list of level strings
+        """
+        X = np.asarray(feature_matrix, dtype=np.float32)
+        risk_probs = self.model.predict_proba(X)[:, 1]
+        risk_levels = [self._risk_level(p) for p in risk_probs]
+        return risk_probs, risk_levels
+
     def _format_feature_name(self, feature: str) -> str:
         """Convert feature name to human-readable format"""
         name_map = {
@@ -104,5 +172,8 @@ class ReadmissionPredictor:
         }
         return name_map.get(feature, feature)
 
-# Global instance (singleton)
-predictor = ReadmissionPredictor()
+@lru_cache(maxsize=1)
+def get_predictor() -> ReadmissionPredictor:
+    """Load the model lazily on first prediction instead of at import,
+    so workers that never predict skip the unpickle cost entirely"""
+    return ReadmissionPredictor()
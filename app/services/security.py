@@ -1,82 +1,128 @@
-from datetime import datetime, timedelta
-from typing import List, Callable
-
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
-
-from app.db import SessionLocal
-from app.models import User, AuditLog
-from app.auth import SECRET_KEY, ALGORITHM, get_user_claims, create_access_token, verify_password
-
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-
-
-# ----- DB dependency -----
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-# ----- User helpers -----
-
-def get_user_by_username(db: Session, username: str) -> User | None:
-    return db.query(User).filter(User.username == username).first()
-
-
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    user = get_user_by_username(db, username=username)
-    if user is None:
-        raise credentials_exception
-    return user
-
-
-def require_role(required_roles: List[str]) -> Callable:
-    def _inner(user: User = Depends(get_current_user)):
-        if user.role not in required_roles:
-            raise HTTPException(status_code=403, detail="Not enough permissions")
-        return user
-    return _inner
-
-
-# ----- Audit logging -----
-# app/services/security.py - Find log_action function:
-def log_action(db: Session, user, action: str, resource: str = None, details: str = None):
-    """Log user action - simplified"""
-    pass  # Disable audit logging for now
-
-# def log_action(
-#     db: Session,
-#     user: User,
-#     action: str,
-#     details: str | None = None,
-# ) -> None:
-#     entry = AuditLog(
-#         user_id=user.id,
-#         action=action,
-#         details=details,
-#     )
-#     db.add(entry)
-    # caller decides when to commit
+import hashlib
+import time
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import List, Callable
+
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+import jwt
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models import User
+from app.auth import SECRET_KEY, ALGORITHM, get_user_claims, create_access_token, verify_password
+
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+
+
+# ----- User helpers -----
+
+# Precompiled statement: skips rebuilding and recompiling the same SELECT on
+# every login / authenticated request
+_user_by_username_stmt = lambda_stmt(
+    lambda: select(User).where(User.username == bindparam("u"))
+)
+
+
+def get_user_by_username(db: Session, username: str) -> User | None:
+    return db.execute(_user_by_username_stmt, {"u": username}).scalar_one_or_none()
+
+
+# Short-TTL cache of authenticated users: the same hot users hit the API many
+# times per 30s window, and user rows change rarely, so skip the per-request
+# SELECT. Login still goes through get_user_by_username so password checks
+# always see fresh rows.
+_user_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+def invalidate_user_cache(username: str) -> None:
+    """Drop a cached user after role/password changes"""
+    _user_cache.pop(username, None)
+
+
+# The same token is re-presented on every request from the same browser, so
+# cache decoded claims keyed by a token digest and skip the repeated HMAC
+# verification. Entries expire with the JWT's own exp claim; invalid tokens
+# never reach the cache.
+_TOKEN_CACHE_MAX = 4096
+_token_cache: dict[bytes, tuple[dict, float]] = {}
+
+# Built once: require the claims we rely on, skip the aud check we never issue
+_JWT_OPTS = {"require": ["exp", "sub"], "verify_aud": False}
+
+
+def decode_token_cached(token: str) -> dict:
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        claims, exp = cached
+        if exp > time.time():
+            return claims
+        del _token_cache[key]
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options=_JWT_OPTS)
+    exp = float(claims.get("exp", 0))
+
+    if len(_token_cache) >= _TOKEN_CACHE_MAX:
+        _token_cache.pop(next(iter(_token_cache)))  # evict oldest entry
+    _token_cache[key] = (claims, exp)
+    return claims
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_token_cached(token)
+        username: str | None = payload.get("sub")
+        if username is None:
+            raise credentials_exception
+    except jwt.PyJWTError:
+        raise credentials_exception
+
+    user = _user_cache.get(username)
+    if user is None:
+        user = get_user_by_username(db, username=username)
+        if user is None:
+            raise credentials_exception
+        # Detach before caching so a later session commit can't expire the
+        # instance and force a lazy reload from a closed session
+        db.expunge(user)
+        _user_cache[username] = user
+    return user
+
+
+@lru_cache(maxsize=None)
+def _require_role_cached(required_roles: tuple) -> Callable:
+    def _inner(user: User = Depends(get_current_user)):
+        if user.role not in required_roles:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return user
+    return _inner
+
+
+def require_role(required_roles: List[str]) -> Callable:
+    # Same role list always returns the same dependency object, so FastAPI
+    # can share the resolved dependency instead of allocating a new closure
+    return _require_role_cached(tuple(required_roles))
+
+
+# Shared dependency for endpoints any clinical user may call
+require_clinician = require_role(["nurse", "doctor", "admin"])
+
+
+# ----- Audit logging -----
+# Implementation lives in app.services.audit; re-exported here because the
+# routers import log_action from this module.
+from app.services.audit import log_action, flush_audit_queue  # noqa: E402
@@ -0,0 +1,22 @@
+-- Materialize patient age so the risk scorer reads a column instead of
+-- redoing date math per request. A STORED generated column can't be used
+-- here: age(dob) depends on current_date and is only STABLE, and PostgreSQL
+-- requires generation expressions to be IMMUTABLE. A trigger keeps the
+-- column in step with dob on write; re-run the backfill UPDATE from a
+-- scheduled job so ages don't go stale on rows that are never rewritten.
+ALTER TABLE patients ADD COLUMN IF NOT EXISTS age_years INTEGER;
+
+CREATE OR REPLACE FUNCTION patients_set_age_years() RETURNS trigger AS $$
+BEGIN
+    NEW.age_years := EXTRACT(YEAR FROM age(NEW.dob))::int;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_patients_age_years ON patients;
+CREATE TRIGGER trg_patients_age_years
+    BEFORE INSERT OR UPDATE OF dob ON patients
+    FOR EACH ROW EXECUTE FUNCTION patients_set_age_years();
+
+-- Backfill existing rows
+UPDATE patients SET age_years = EXTRACT(YEAR FROM age(dob))::int;
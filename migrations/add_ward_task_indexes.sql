@@ -0,0 +1,15 @@
+-- Index-backed ordering for the ward risk board and task list
+CREATE INDEX IF NOT EXISTS ix_encounters_risk_score_desc ON encounters (risk_score DESC);
+CREATE INDEX IF NOT EXISTS ix_encounters_level_score ON encounters (risk_level, risk_score DESC);
+CREATE INDEX IF NOT EXISTS ix_tasks_status_created ON tasks (status, created_at DESC);
+
+-- At most one open task of a given type per encounter; the high-risk
+-- predict path's INSERT ... ON CONFLICT DO NOTHING relies on this
+CREATE UNIQUE INDEX IF NOT EXISTS uq_open_task_per_encounter
+    ON tasks (patient_id, encounter_id, task_type)
+    WHERE status = 'open';
+
+-- Covers task lookups regardless of status (the partial index above
+-- only serves open tasks)
+CREATE INDEX IF NOT EXISTS ix_tasks_lookup
+    ON tasks (patient_id, encounter_id, task_type, status);
@@ -1,97 +1,98 @@
 # scripts/generate_synthetic_mimic.py
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 
 np.random.seed(42)
 
 def generate_synthetic_data(n_patients=100):
     """Generate realistic MIMIC-III style synthetic data"""
-    
-    # Generate patients
-    patients = []
-    for i in range(1, n_patients + 1):
-        gender = np.random.choice(['M', 'F'], p=[0.54, 0.46])
-        dob_year = np.random.randint(1930, 2000)
-        patients.append({
-            'patient_id': i,
-            'first_name': f'Patient{i}',
-            'last_name': f'Lastname{i}',
-            'gender': gender,
-            'dob': f'{dob_year}-01-01'
-        })
-    
-    # Generate encounters
-    encounters = []
-    encounter_id = 1
-    
-    for patient in patients:
-        n_encounters = np.random.choice([1, 2, 3], p=[0.70, 0.20, 0.10])
-        
-        for encounter_num in range(n_encounters):
-            admit_date = datetime(2025, 1, 1) + timedelta(days=np.random.randint(0, 365))
-            age = admit_date.year - int(patient['dob'].split('-')[0])
-            
-            los_days = max(1, int(np.random.lognormal(1.7, 0.8)))
-            discharge_date = admit_date + timedelta(days=los_days)
-            
-            previous_admissions = encounter_num
-            days_since_last_admit = -1 if encounter_num == 0 else np.random.randint(30, 180)
-            
-            diagnosis_count = max(3, int(np.random.poisson(13)))
-            
-            if age < 40:
-                charlson_score = np.random.choice([0, 1, 2], p=[0.6, 0.3, 0.1])
-            elif age < 60:
-                charlson_score = np.random.choice([0, 1, 2, 3, 4], p=[0.2, 0.3, 0.25, 0.15, 0.1])
-            else:
-                charlson_score = np.random.choice([1, 2, 3, 4, 5, 6], p=[0.15, 0.25, 0.25, 0.2, 0.1, 0.05])
-            
-            procedure_count = max(0, int(np.random.poisson(3.9)))
-            icu_stay_count = np.random.choice([1, 2, 3], p=[0.85, 0.12, 0.03])
-            icu_los_days = min(los_days, max(1, int(np.random.exponential(4.7))))
-            
-            admit_type = np.random.choice(['EMERGENCY', 'ELECTIVE', 'URGENT'], p=[0.92, 0.06, 0.02])
-            
-            if age >= 65:
-                insurance = np.random.choice(['Medicare', 'Private', 'Medicaid'], p=[0.85, 0.10, 0.05])
-            else:
-                insurance = np.random.choice(['Private', 'Medicare', 'Medicaid'], p=[0.60, 0.25, 0.15])
-            
-            hospital_expire_flag = 1 if np.random.random() < 0.31 else 0
-            
-            encounters.append({
-                'encounter_id': encounter_id,
-                'patient_id': patient['patient_id'],
-                'admit_date': admit_date.strftime('%Y-%m-%d'),
-                'discharge_date': discharge_date.strftime('%Y-%m-%d'),
-                'diagnosis': f'ICD9_{np.random.randint(100, 999)}',
-                'age_years_cleaned': float(age),
-                'gender_M': 1 if patient['gender'] == 'M' else 0,
-                'los_days': float(los_days),
-                'previous_admissions': previous_admissions,
-                'days_since_last_admit': float(days_since_last_admit),
-                'diagnosis_count': diagnosis_count,
-                'charlson_score': charlson_score,
-                'procedure_count': procedure_count,
-                'icu_stay_count': icu_stay_count,
-                'icu_los_days': float(icu_los_days),
-                'admit_type_EMERGENCY': 1 if admit_type == 'EMERGENCY' else 0,
-                'admit_type_URGENT': 1 if admit_type == 'URGENT' else 0,
-                'insurance_Medicare': 1 if insurance == 'Medicare' else 0,
-                'insurance_Private': 1 if insurance == 'Private' else 0,
-                'hospital_expire_flag': hospital_expire_flag
-            })
-            
-            encounter_id += 1
-    
-    return pd.DataFrame(patients), pd.DataFrame(encounters)
+
+    # Generate patients - every column drawn vectorized in one call
+    patient_ids = np.arange(1, n_patients + 1)
+    genders = np.random.choice(['M', 'F'], size=n_patients, p=[0.54, 0.46])
+    dob_years = np.random.randint(1930, 2000, size=n_patients)
+
+    patients_df = pd.DataFrame({
+        'patient_id': patient_ids,
+        'first_name': [f'Patient{i}' for i in patient_ids],
+        'last_name': [f'Lastname{i}' for i in patient_ids],
+        'gender': genders,
+        'dob': [f'{y}-01-01' for y in dob_years],
+    })
+
+    # Generate encounters: decide counts per patient first, then draw every
+    # feature as a length-N array instead of looping row by row
+    n_encounters = np.random.choice([1, 2, 3], size=n_patients, p=[0.70, 0.20, 0.10])
+    total = int(n_encounters.sum())
+
+    patient_idx = np.repeat(np.arange(n_patients), n_encounters)
+    encounter_nums = np.concatenate([np.arange(k) for k in n_encounters])
+
+    admit_offsets = np.random.randint(0, 365, size=total)
+    admit_dates = np.datetime64('2025-01-01') + admit_offsets.astype('timedelta64[D]')
+    ages = 2025 - dob_years[patient_idx]
+
+    los_days = np.maximum(1, np.random.lognormal(1.7, 0.8, size=total).astype(int))
+    discharge_dates = admit_dates + los_days.astype('timedelta64[D]')
+
+    previous_admissions = encounter_nums
+    days_since_last_admit = np.where(
+        encounter_nums == 0, -1, np.random.randint(30, 180, size=total)
+    )
+
+    diagnosis_counts = np.maximum(3, np.random.poisson(13, size=total))
+
+    # Age-dependent Charlson: draw from each band's distribution for all rows,
+    # then select by age mask
+    charlson_young = np.random.choice([0, 1, 2], size=total, p=[0.6, 0.3, 0.1])
+    charlson_mid = np.random.choice([0, 1, 2, 3, 4], size=total, p=[0.2, 0.3, 0.25, 0.15, 0.1])
+    charlson_old = np.random.choice([1, 2, 3, 4, 5, 6], size=total, p=[0.15, 0.25, 0.25, 0.2, 0.1, 0.05])
+    charlson_scores = np.select([ages < 40, ages < 60], [charlson_young, charlson_mid], default=charlson_old)
+
+    procedure_counts = np.maximum(0, np.random.poisson(3.9, size=total))
+    icu_stay_counts = np.random.choice([1, 2, 3], size=total, p=[0.85, 0.12, 0.03])
+    icu_los_days = np.minimum(
+        los_days, np.maximum(1, np.random.exponential(4.7, size=total).astype(int))
+    )
+
+    admit_types = np.random.choice(['EMERGENCY', 'ELECTIVE', 'URGENT'], size=total, p=[0.92, 0.06, 0.02])
+
+    insurance_old = np.random.choice(['Medicare', 'Private', 'Medicaid'], size=total, p=[0.85, 0.10, 0.05])
+    insurance_young = np.random.choice(['Private', 'Medicare', 'Medicaid'], size=total, p=[0.60, 0.25, 0.15])
+    insurances = np.where(ages >= 65, insurance_old, insurance_young)
+
+    hospital_expire_flags = (np.random.random(total) < 0.31).astype(int)
+
+    encounters_df = pd.DataFrame({
+        'encounter_id': np.arange(1, total + 1),
+        'patient_id': patient_ids[patient_idx],
+        'admit_date': pd.Series(admit_dates).dt.strftime('%Y-%m-%d'),
+        'discharge_date': pd.Series(discharge_dates).dt.strftime('%Y-%m-%d'),
+        'diagnosis': 'ICD9_' + pd.Series(np.random.randint(100, 999, size=total)).astype(str),
+        'age_years_cleaned': ages.astype(float),
+        'gender_M': (genders[patient_idx] == 'M').astype(int),
+        'los_days': los_days.astype(float),
+        'previous_admissions': previous_admissions,
+        'days_since_last_admit': days_since_last_admit.astype(float),
+        'diagnosis_count': diagnosis_counts,
+        'charlson_score': charlson_scores,
+        'procedure_count': procedure_counts,
+        'icu_stay_count': icu_stay_counts,
+        'icu_los_days': icu_los_days.astype(float),
+        'admit_type_EMERGENCY': (admit_types == 'EMERGENCY').astype(int),
+        'admit_type_URGENT': (admit_types == 'URGENT').astype(int),
+        'insurance_Medicare': (insurances == 'Medicare').astype(int),
+        'insurance_Private': (insurances == 'Private').astype(int),
+        'hospital_expire_flag': hospital_expire_flags,
+    })
+
+    return patients_df, encounters_df
 
 if __name__ == "__main__":
     patients_df, encounters_df = generate_synthetic_data(100)
     patients_df.to_csv('data/patients.csv', index=False)
     encounters_df.to_csv('data/encounters.csv', index=False)
-    
+
     print(f"✅ Generated {len(patients_df)} patients")
     print(f"✅ Generated {len(encounters_df)} encounters")
     print(f"\n📊 Sample features:")
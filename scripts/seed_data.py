@@ -1,56 +1,72 @@
-from datetime import date
-from app.db import SessionLocal
-from app.models import Patient, Encounter, Task
-from app.db import Base, engine
-from app.risk import calculate_readmission_risk
-
-def main():
-    Base.metadata.create_all(bind=engine)
-
-    db = SessionLocal()
-    try:
-        if db.query(Patient).count() == 0:
-            p1 = Patient(first_name="John", last_name="Doe", birth_date=date(1980, 5, 20), gender="M")
-            p2 = Patient(first_name="Mary", last_name="Smith", birth_date=date(1950, 9, 10), gender="F")
-            db.add_all([p1, p2])
-            db.commit()
-
-            e1 = Encounter(
-                patient_id=p1.id,
-                encounter_type="IPD",
-                start_date=date(2025, 12, 1),
-                end_date=date(2025, 12, 10),
-            )
-            e2 = Encounter(
-                patient_id=p2.id,
-                encounter_type="IPD",
-                start_date=date(2025, 12, 5),
-                end_date=date(2025, 12, 7),
-            )
-            db.add_all([e1, e2])
-            db.commit()
-
-            # compute risk using the function
-            for enc in [e1, e2]:
-                patient = p1 if enc.patient_id == p1.id else p2
-                score, level = calculate_readmission_risk(patient, enc)
-                enc.risk_score = score
-                enc.risk_level = level
-            db.commit()
-
-            # create tasks only for high risk
-            for enc in [e1, e2]:
-                if enc.risk_level == "high":
-                    t = Task(
-                        patient_id=enc.patient_id,
-                        encounter_id=enc.id,
-                        task_type="nurse_review",
-                        status="open",
-                    )
-                    db.add(t)
-            db.commit()
-    finally:
-        db.close()
-
-if __name__ == "__main__":
-    main()
+from datetime import date
+from sqlalchemy import insert
+from app.db import SessionLocal
+from app.models import Patient, Encounter, Task
+from app.db import Base, engine
+from app.risk import score_encounters_batch, risk_levels_for_scores
+
+def main():
+    Base.metadata.create_all(bind=engine)
+
+    # One transaction for the whole seed: a single commit/fsync at the end,
+    # and automatic rollback if anything inside fails
+    with SessionLocal.begin() as db:
+        if db.query(Patient).count() == 0:
+            # Plain dicts, DB-assigned ids: INSERT ... RETURNING hands back
+            # the generated keys in input order, so there is no flush or
+            # read-back SELECT between the batches
+            patient_rows = [
+                {"first_name": "John", "last_name": "Doe",
+                 "dob": date(1980, 5, 20), "gender": "M"},
+                {"first_name": "Mary", "last_name": "Smith",
+                 "dob": date(1950, 9, 10), "gender": "F"},
+            ]
+            patient_ids = db.execute(
+                insert(Patient).returning(
+                    Patient.patient_id, sort_by_parameter_order=True
+                ),
+                patient_rows,
+            ).scalars().all()
+
+            encounter_rows = [
+                {"patient_id": patient_ids[0],
+                 "admit_date": date(2025, 12, 1), "discharge_date": date(2025, 12, 10)},
+                {"patient_id": patient_ids[1],
+                 "admit_date": date(2025, 12, 5), "discharge_date": date(2025, 12, 7)},
+            ]
+
+            # Risk computed up front and carried in the insert dicts, so the
+            # encounters never need a read-back-and-update pass
+            today = date.today()
+            ages_by_id = {
+                pid: today.year - row["dob"].year
+                for pid, row in zip(patient_ids, patient_rows)
+            }
+            ages = [ages_by_id[e["patient_id"]] for e in encounter_rows]
+            los = [(e["discharge_date"] - e["admit_date"]).days for e in encounter_rows]
+            scores = score_encounters_batch(ages, los, [-1] * len(encounter_rows))
+            levels = risk_levels_for_scores(scores)
+
+            for enc, score, level in zip(encounter_rows, scores, levels):
+                enc["risk_score"] = float(score)
+                enc["risk_level"] = str(level)
+
+            encounter_ids = db.execute(
+                insert(Encounter).returning(
+                    Encounter.encounter_id, sort_by_parameter_order=True
+                ),
+                encounter_rows,
+            ).scalars().all()
+
+            # create tasks only for high risk
+            task_rows = [
+                {"patient_id": enc["patient_id"], "encounter_id": encounter_id,
+                 "task_type": "nurse_review", "status": "open"}
+                for encounter_id, enc in zip(encounter_ids, encounter_rows)
+                if enc["risk_level"] == "high"
+            ]
+            if task_rows:
+                db.execute(insert(Task), task_rows)
+
+if __name__ == "__main__":
+    main()
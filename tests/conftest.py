@@ -0,0 +1,7 @@
+# tests/conftest.py
+# Point the app at an in-memory SQLite DB before anything imports app.db:
+# every query stays in RAM (no file, no fsync per commit) and app.db picks
+# a StaticPool so all sessions share the single in-memory database.
+import os
+
+os.environ["DATABASE_URL"] = "sqlite://"
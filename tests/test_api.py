@@ -1,81 +1,101 @@
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
 from app.main import app
 from app.db import Base, engine, SessionLocal
 from app.models import Patient, Encounter, Task
 from datetime import date
 
-client = TestClient(app)
-
-# Setup: ensure tables exist
-Base.metadata.create_all(bind=engine)
-
 
 def setup_test_data():
     """Add test patient and encounter for prediction/ward tests"""
     db = SessionLocal()
     try:
-        # Check if data already exists
-        existing = db.query(Patient).filter(Patient.id == 999).first()
-        if existing:
-            return
-        
-        patient = Patient(
-            id=999,
-            first_name="Test",
-            last_name="Patient",
-            birth_date=date(1950, 1, 1),
-            gender="M",
+        # Plain INSERT OR IGNORE per table: no existence SELECT, no ORM
+        # unit-of-work bookkeeping, one round-trip each
+        db.execute(
+            insert(Patient).prefix_with("OR IGNORE"),
+            [{
+                "patient_id": 999,
+                "first_name": "Test",
+                "last_name": "Patient",
+                "dob": date(1950, 1, 1),
+                "gender": "M",
+            }],
         )
-        db.add(patient)
-        
-        encounter = Encounter(
-            id=999,
-            patient_id=999,
-            encounter_type="IPD",
-            start_date=date(2025, 12, 1),
-            end_date=date(2025, 12, 10),
-            risk_score=0.8,
-            risk_level="high",
+        db.execute(
+            insert(Encounter).prefix_with("OR IGNORE"),
+            [{
+                "encounter_id": 999,
+                "patient_id": 999,
+                "admit_date": date(2025, 12, 1),
+                "discharge_date": date(2025, 12, 10),
+                "risk_score": 0.8,
+                "risk_level": "high",
+                # ML features so the predict endpoint can score this encounter
+                "age_years_cleaned": 75.0,
+                "gender_M": 1,
+                "los_days": 9.0,
+                "previous_admissions": 2,
+                "days_since_last_admit": 30.0,
+                "diagnosis_count": 12,
+                "charlson_score": 4,
+                "procedure_count": 3,
+                "icu_stay_count": 1,
+                "icu_los_days": 2.0,
+                "admit_type_EMERGENCY": 1,
+                "admit_type_URGENT": 0,
+                "insurance_Medicare": 1,
+                "insurance_Private": 0,
+                "hospital_expire_flag": 0,
+            }],
         )
-        db.add(encounter)
-        
-        task = Task(
-            id=999,
-            patient_id=999,
-            encounter_id=999,
-            task_type="nurse_review",
-            status="open",
+        db.execute(
+            insert(Task).prefix_with("OR IGNORE"),
+            [{
+                "task_id": 999,
+                "patient_id": 999,
+                "encounter_id": 999,
+                "task_type": "nurse_review",
+                "status": "open",
+            }],
         )
-        db.add(task)
-        
         db.commit()
     finally:
         db.close()
 
 
-setup_test_data()
+# ===== Fixtures =====
+# Session scope: one TestClient (lifespan runs once), one register + login
+# for the whole suite instead of an argon2 hash + two requests per test.
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(bind=engine)
+    setup_test_data()
+    with TestClient(app) as c:
+        yield c
 
 
-def get_auth_token():
-    """Helper to get auth token for tests"""
-    # Register if not exists
+@pytest.fixture(scope="session")
+def auth_headers(client):
     register_payload = {
         "username": "testuser",
         "password": "testpass123",
-        "full_name": "Test User",
         "role": "nurse",
     }
+    # Ignore failures if the user already exists from a previous run
     client.post("/auth/register", json=register_payload)
-    
-    # Login
+
     login_data = {"username": "testuser", "password": "testpass123"}
     response = client.post("/auth/login", data=login_data)
-    return response.json()["access_token"]
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
 
 
 # ===== Basic Health Check =====
 
-def test_health_check():
+def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
@@ -83,11 +103,10 @@ def test_health_check():
 
 # ===== Auth Tests =====
 
-def test_register_and_login():
+def test_register_and_login(client):
     register_payload = {
         "username": "newuser",
         "password": "testpass123",
-        "full_name": "New User",
         "role": "doctor",
     }
     response = client.post("/auth/register", json=register_payload)
@@ -100,55 +119,54 @@ def test_register_and_login():
     assert "access_token" in response.json()
 
 
-def test_login_invalid_credentials():
+def test_login_invalid_credentials(client):
     login_data = {"username": "fake", "password": "fake"}
     response = client.post("/auth/login", data=login_data)
     assert response.status_code == 400
 
 
-# ===== Patients Tests =====
+# ===== Auth-required endpoints =====
+# One parametrized test per group instead of a copy per endpoint
+
+AUTH_REQUIRED_PATHS = [
+    "/patients",
+    "/ward/risk",
+    "/ward/tasks",
+    "/predict/readmission/999",
+]
 
-def test_patients_without_auth():
-    response = client.get("/patients")
+
+@pytest.mark.parametrize("path", AUTH_REQUIRED_PATHS)
+def test_requires_auth(client, path):
+    response = client.get(path)
     assert response.status_code == 401
 
 
-def test_patients_with_auth():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.get("/patients", headers=headers)
+@pytest.mark.parametrize("path", ["/patients", "/ward/risk", "/ward/tasks"])
+def test_list_endpoints_with_auth(client, auth_headers, path):
+    response = client.get(path, headers=auth_headers)
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
 
-def test_get_patient_by_id():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.get("/patients/999", headers=headers)
+# ===== Patients Tests =====
+
+def test_get_patient_by_id(client, auth_headers):
+    response = client.get("/patients/999", headers=auth_headers)
     assert response.status_code == 200
     assert response.json()["first_name"] == "Test"
 
 
-def test_get_patient_not_found():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.get("/patients/99999", headers=headers)
+def test_get_patient_not_found(client, auth_headers):
+    response = client.get("/patients/99999", headers=auth_headers)
     assert response.status_code == 404
 
 
 # ===== Ward Risk Tests =====
 
-def test_ward_risk_without_auth():
-    response = client.get("/ward/risk")
-    assert response.status_code == 401
-
-
-def test_ward_risk_with_auth():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.get("/ward/risk", headers=headers)
+def test_ward_risk_with_auth(client, auth_headers):
+    response = client.get("/ward/risk", headers=auth_headers)
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
     # Should include our test patient with risk data
     data = response.json()
     assert len(data) > 0
@@ -156,10 +174,32 @@ def test_ward_risk_with_auth():
     assert all("los_days" in item for item in data)
 
 
-def test_ward_risk_filter_by_high():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.get("/ward/risk?min_level=high", headers=headers)
+def test_ward_risk_no_n_plus_one(client, auth_headers):
+    # Patient rows are joined in with the encounters, so the endpoint should
+    # never lazy-load per row: at most one SELECT for the board plus one for
+    # the authenticated user
+    from sqlalchemy import event
+    from app.db import engine
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/ward/risk", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(response.json()) > 0
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) <= 2
+
+
+def test_ward_risk_filter_by_high(client, auth_headers):
+    response = client.get("/ward/risk?min_level=high", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
     # All returned patients should be high risk
@@ -167,83 +207,66 @@ def test_ward_risk_filter_by_high():
         assert item["risk_level"] == "high"
 
 
-# ===== Tasks Tests =====
-
-def test_tasks_without_auth():
-    response = client.get("/tasks")
-    assert response.status_code == 401
-
+def test_ward_risk_gzipped(client, auth_headers):
+    # Enough rows to clear GZipMiddleware's minimum_size threshold
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(Encounter).prefix_with("OR IGNORE"),
+            [{
+                "encounter_id": 2000 + i,
+                "patient_id": 999,
+                "risk_score": 0.5,
+                "risk_level": "medium",
+            } for i in range(30)],
+        )
+        db.commit()
+    finally:
+        db.close()
 
-def test_tasks_with_auth():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.get("/tasks", headers=headers)
+    response = client.get(
+        "/ward/risk?limit=100",
+        headers={**auth_headers, "Accept-Encoding": "gzip"},
+    )
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    assert response.headers.get("content-encoding") == "gzip"
 
 
-def test_tasks_filter_by_status():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    
+# ===== Tasks Tests =====
+
+def test_tasks_filter_by_status(client, auth_headers):
     # Get open tasks
-    response = client.get("/tasks?status_filter=open", headers=headers)
+    response = client.get("/ward/tasks?status_filter=open", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
     for task in data:
         assert task["status"] == "open"
 
 
-def test_complete_task():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    
+def test_complete_task(client, auth_headers):
     # Complete task 999
-    response = client.post("/tasks/999/complete", headers=headers)
+    response = client.post("/ward/tasks/999/complete", headers=auth_headers)
     assert response.status_code == 200
     assert response.json()["status"] == "completed"
     assert response.json()["completed_at"] is not None
 
 
-def test_complete_task_not_found():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    response = client.post("/tasks/99999/complete", headers=headers)
+def test_complete_task_not_found(client, auth_headers):
+    response = client.post("/ward/tasks/99999/complete", headers=auth_headers)
     assert response.status_code == 404
 
 
 # ===== Prediction Tests =====
 
-def test_predict_readmission_without_auth():
-    payload = {"patient_id": 999, "encounter_id": 999}
-    response = client.post("/predict/readmission", json=payload)
-    assert response.status_code == 401
-
-
-def test_predict_readmission_with_auth():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    payload = {"patient_id": 999, "encounter_id": 999}
-    response = client.post("/predict/readmission", json=payload, headers=headers)
+def test_predict_readmission_with_auth(client, auth_headers):
+    response = client.get("/predict/readmission/999", headers=auth_headers)
     assert response.status_code == 200
     data = response.json()
     assert "risk_score" in data
     assert "risk_level" in data
-    assert data["patient_id"] == 999
     assert data["encounter_id"] == 999
 
 
-def test_predict_readmission_patient_not_found():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    payload = {"patient_id": 99999, "encounter_id": 999}
-    response = client.post("/predict/readmission", json=payload, headers=headers)
-    assert response.status_code == 404
-
-
-def test_predict_readmission_encounter_not_found():
-    token = get_auth_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    payload = {"patient_id": 999, "encounter_id": 99999}
-    response = client.post("/predict/readmission", json=payload, headers=headers)
+def test_predict_readmission_encounter_not_found(client, auth_headers):
+    response = client.get("/predict/readmission/99999", headers=auth_headers)
     assert response.status_code == 404
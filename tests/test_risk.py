@@ -1,6 +1,7 @@
+import pytest
 from app.risk import calculate_los_risk
 from app.models import Encounter
-from datetime import date
+from datetime import date, timedelta
 
 
 class DummyEncounter2:
@@ -9,21 +10,21 @@ class DummyEncounter2:
         self.end_date = end_date
 
 
-def test_los_short():
+@pytest.mark.parametrize(
+    "days,level",
+    [
+        (1, "short"),
+        (3, "medium"),
+        (7, "medium"),
+        (8, "long"),
+        (14, "long"),
+    ],
+)
+def test_los_levels(days, level):
     enc = DummyEncounter2(
         start_date=date(2025, 1, 1),
-        end_date=date(2025, 1, 2),
+        end_date=date(2025, 1, 1) + timedelta(days=days),
     )
     los_days, los_level = calculate_los_risk(enc)
-    assert los_days == 1
-    assert los_level == "short"
-
-
-def test_los_long():
-    enc = DummyEncounter2(
-        start_date=date(2025, 1, 1),
-        end_date=date(2025, 1, 15),
-    )
-    los_days, los_level = calculate_los_risk(enc)
-    assert los_days == 14
-    assert los_level == "long"
+    assert los_days == days
+    assert los_level == level
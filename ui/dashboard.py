@@ -1,5 +1,8 @@
 import streamlit as st
-import requests
+import httpx
+import jwt
+import pandas as pd
+import time
 from datetime import datetime
 
 # API base URL
@@ -17,18 +20,31 @@ if "token" not in st.session_state:
     st.session_state.token = None
 if "username" not in st.session_state:
     st.session_state.username = None
+if "token_exp" not in st.session_state:
+    st.session_state.token_exp = 0.0
+
+
+def get_http() -> httpx.Client:
+    """One pooled HTTP client per session, reused across Streamlit reruns
+    (keeps the TCP connection open instead of a handshake per request)"""
+    if "http" not in st.session_state:
+        st.session_state.http = httpx.Client(base_url=API_BASE, http2=True, timeout=5)
+    return st.session_state.http
 
 
 def login(username: str, password: str):
     """Login and get JWT token"""
-    response = requests.post(
-        f"{API_BASE}/auth/login",
+    response = get_http().post(
+        "/auth/login",
         data={"username": username, "password": password},
     )
     if response.status_code == 200:
         data = response.json()
         st.session_state.token = data["access_token"]
         st.session_state.username = username
+        # Remember when the token dies (unverified decode - just reading exp)
+        claims = jwt.decode(data["access_token"], options={"verify_signature": False})
+        st.session_state.token_exp = float(claims.get("exp", 0))
         return True
     return False
 
@@ -38,10 +54,41 @@ def get_headers():
     return {"Authorization": f"Bearer {st.session_state.token}"}
 
 
+# Cached fetches: Streamlit reruns this whole script on every widget
+# interaction, so without a cache each click refetches the board and tasks.
+# 10s of staleness buys zero network/DB work on repeat renders; mutations
+# clear the cache so the UI updates immediately.
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_ward_risk(risk_filter: str, token: str):
+    params = {} if risk_filter == "All" else {"min_level": risk_filter}
+    response = get_http().get(
+        "/ward/risk",
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+    )
+    return response.status_code, (response.json() if response.status_code == 200 else None)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_tasks(status_filter: str, token: str):
+    params = {} if status_filter == "All" else {"status_filter": status_filter}
+    response = get_http().get(
+        "/ward/tasks",
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+    )
+    return response.status_code, (response.json() if response.status_code == 200 else None)
+
+
 def logout():
     """Clear session"""
     st.session_state.token = None
     st.session_state.username = None
+    st.session_state.token_exp = 0.0
+    http = st.session_state.pop("http", None)
+    if http is not None:
+        http.close()
 
 
 # ===== LOGIN PAGE =====
@@ -65,6 +112,12 @@ if not st.session_state.token:
 
 # ===== MAIN DASHBOARD =====
 else:
+    # Expired token: every API call below would just 401, so skip the
+    # round-trips and go straight back to the login form
+    if time.time() >= st.session_state.token_exp:
+        logout()
+        st.rerun()
+
     # Header
     col1, col2 = st.columns([4, 1])
     with col1:
@@ -90,20 +143,18 @@ else:
         )
 
         try:
-            params = {} if risk_filter == "All" else {"min_level": risk_filter}
-            response = requests.get(
-                f"{API_BASE}/ward/risk",
-                headers=get_headers(),
-                params=params,
-            )
-
-            if response.status_code == 200:
-                patients = response.json()
+            status_code, patients = fetch_ward_risk(risk_filter, st.session_state.token)
 
+            if status_code == 200:
                 if patients:
+                    # One DataFrame feeds both the table widget and the
+                    # stats, so the metrics are C-level reductions instead
+                    # of Python passes over list-of-dicts
+                    ward_df = pd.DataFrame(patients)
+
                     # Display as table
                     st.dataframe(
-                        patients,
+                        ward_df,
                         column_config={
                             "patient_id": "Patient ID",
                             "first_name": "First Name",
@@ -123,17 +174,17 @@ else:
                     # Stats
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Total Patients", len(patients))
+                        st.metric("Total Patients", len(ward_df))
                     with col2:
-                        high_risk = len([p for p in patients if p["risk_level"] == "high"])
+                        high_risk = int((ward_df["risk_level"] == "high").sum())
                         st.metric("High Risk", high_risk)
                     with col3:
-                        avg_score = sum(p["risk_score"] for p in patients) / len(patients)
+                        avg_score = ward_df["risk_score"].mean()
                         st.metric("Avg Risk Score", f"{avg_score:.2f}")
                 else:
                     st.info("No patients match the filter criteria.")
             else:
-                st.error(f"Error fetching ward data: {response.status_code}")
+                st.error(f"Error fetching ward data: {status_code}")
         except Exception as e:
             st.error(f"Connection error: {e}")
 
@@ -149,58 +200,54 @@ else:
         )
 
         try:
-            params = {} if status_filter == "All" else {"status_filter": status_filter}
-            response = requests.get(
-                f"{API_BASE}/tasks",
-                headers=get_headers(),
-                params=params,
-            )
-
-            if response.status_code == 200:
-                tasks = response.json()
+            status_code, tasks = fetch_tasks(status_filter, st.session_state.token)
 
+            if status_code == 200:
                 if tasks:
-                    for task in tasks:
-                        with st.container():
-                            col1, col2, col3 = st.columns([2, 2, 1])
-
-                            with col1:
-                                st.write(f"**Task #{task['id']}** - {task['task_type']}")
-                                st.caption(
-                                    f"Patient ID: {task['patient_id']} | Encounter ID: {task['encounter_id']}"
-                                )
-
-                            with col2:
-                                status = task["status"]
-                                if status == "open":
-                                    st.warning(f"Status: {status.upper()}")
-                                else:
-                                    st.success(f"Status: {status.upper()}")
-                                    if task.get("completed_at"):
-                                        st.caption(f"Completed: {task['completed_at']}")
-
-                            with col3:
-                                if task["status"] == "open":
-                                    if st.button(
-                                        "Complete",
-                                        key=f"complete_{task['id']}",
-                                        use_container_width=True,
-                                    ):
-                                        complete_response = requests.post(
-                                            f"{API_BASE}/tasks/{task['id']}/complete",
-                                            headers=get_headers(),
-                                        )
-                                        if complete_response.status_code == 200:
-                                            st.success("Task completed!")
-                                            st.rerun()
-                                        else:
-                                            st.error("Failed to complete task")
-
-                            st.divider()
+                    # One editable table instead of 4 widgets per task:
+                    # Streamlit ships a single columnar payload per rerun
+                    tasks_df = pd.DataFrame(tasks)
+                    tasks_df["complete"] = False
+
+                    edited = st.data_editor(
+                        tasks_df,
+                        column_config={
+                            "task_id": "Task ID",
+                            "patient_id": "Patient ID",
+                            "encounter_id": "Encounter ID",
+                            "task_type": "Task Type",
+                            "status": "Status",
+                            "created_at": "Created",
+                            "completed_at": "Completed",
+                            "complete": st.column_config.CheckboxColumn(
+                                "Complete?",
+                                help="Tick to mark the task completed",
+                            ),
+                        },
+                        disabled=[c for c in tasks_df.columns if c != "complete"],
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+
+                    # POST only the rows the nurse ticked
+                    to_complete = edited.loc[
+                        edited["complete"] & (edited["status"] == "open"), "task_id"
+                    ]
+                    if len(to_complete):
+                        for task_id in to_complete:
+                            complete_response = get_http().post(
+                                f"/ward/tasks/{int(task_id)}/complete",
+                                headers=get_headers(),
+                            )
+                            if complete_response.status_code != 200:
+                                st.error(f"Failed to complete task {task_id}")
+                        st.success("Task(s) completed!")
+                        st.cache_data.clear()
+                        st.rerun()
                 else:
                     st.info("No tasks match the filter criteria.")
             else:
-                st.error(f"Error fetching tasks: {response.status_code}")
+                st.error(f"Error fetching tasks: {status_code}")
         except Exception as e:
             st.error(f"Connection error: {e}")
 
@@ -209,20 +256,15 @@ else:
         st.header("Predict Readmission Risk")
 
         with st.form("predict_form"):
-            col1, col2 = st.columns(2)
-            with col1:
-                patient_id = st.number_input("Patient ID", min_value=1, value=1)
-            with col2:
-                encounter_id = st.number_input("Encounter ID", min_value=1, value=1)
+            encounter_id = st.number_input("Encounter ID", min_value=1, value=1)
 
             submit = st.form_submit_button("Predict Risk")
 
             if submit:
                 try:
-                    response = requests.post(
-                        f"{API_BASE}/predict/readmission",
+                    response = get_http().get(
+                        f"/predict/readmission/{encounter_id}",
                         headers=get_headers(),
-                        json={"patient_id": patient_id, "encounter_id": encounter_id},
                     )
 
                     if response.status_code == 200:
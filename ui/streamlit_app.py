@@ -1,7 +1,9 @@
 # ui/streamlit_app.py
+import ijson
 import streamlit as st
 import requests
 import pandas as pd
+from collections import Counter
 from datetime import datetime
 
 
@@ -24,9 +26,20 @@ if "username" not in st.session_state:
     st.session_state.username = None
 
 
+@st.cache_resource
+def http() -> requests.Session:
+    """One pooled Session shared by all reruns: keep-alive connections
+    instead of a fresh TCP socket per call"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def login(username: str, password: str):
     """Login and get JWT token"""
-    response = requests.post(
+    response = http().post(
         f"{API_BASE}/auth/login",
         data={"username": username, "password": password},
     )
@@ -45,12 +58,238 @@ def get_headers():
     return {}
 
 
+# Streamlit reruns the whole script on any widget interaction, so the list
+# fetches are cached for 15s keyed by filter + token; the Refresh buttons
+# clear them explicitly.
+
+@st.cache_data(ttl=15, show_spinner=False)
+def fetch_ward_risk(min_level, token: str, limit: int = 50, offset: int = 0):
+    params = {"limit": limit, "offset": offset}
+    if min_level is not None:
+        params["min_level"] = min_level
+    with http().get(
+        f"{API_BASE}/ward/risk",
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+        stream=True,
+    ) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        # Incremental parse: records come off the wire one at a time
+        # instead of buffering the full body for a single json() call
+        response.raw.decode_content = True
+        return 200, list(ijson.items(response.raw, "item", use_float=True))
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def fetch_ward_tasks(status, token: str):
+    params = {} if status is None else {"status_filter": status}
+    with http().get(
+        f"{API_BASE}/ward/tasks",
+        headers={"Authorization": f"Bearer {token}"},
+        params=params,
+        stream=True,
+    ) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        # The tasks endpoint is a StreamingResponse server-side, so this
+        # parses chunks as they arrive end to end
+        response.raw.decode_content = True
+        return 200, list(ijson.items(response.raw, "item", use_float=True))
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def ping():
+    """Liveness probe against /health, cached so reruns don't re-probe"""
+    try:
+        return http().get(f"{API_BASE}/health", timeout=0.5).status_code
+    except requests.RequestException:
+        return None
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def fetch_details_batch(encounter_ids: tuple, token: str) -> dict:
+    """Prefetch prediction details for a whole page of cards.
+
+    One POST to the server-side batch endpoint instead of a GET per card,
+    so opening any card is a free dict lookup.
+    """
+    response = http().post(
+        f"{API_BASE}/predict/readmission/batch",
+        json={"encounter_ids": list(encounter_ids)},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    if response.status_code != 200:
+        return {}
+    return {d["encounter_id"]: d for d in response.json()}
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_prediction(encounter_id: int, token: str):
+    """Single-encounter prediction, cached so checking the same encounter
+    twice (or in both tabs) costs one backend call"""
+    response = http().get(
+        f"{API_BASE}/predict/readmission/{encounter_id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return response.status_code, (response.json() if response.status_code == 200 else None)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def format_risk_factors(encounter_id: int, factors: list) -> list:
+    """Format the top risk factors once per encounter instead of
+    re-titling/re-splitting strings on every rerun (st.cache_data
+    pickles the args, so the raw list of dicts is a fine cache key)"""
+    return [
+        (f["feature"].replace("_", " ").title(), f["value"], f["direction"], f["impact"])
+        for f in factors[:5]
+    ]
+
+
+def render_factors(encounter_id, risk_factors):
+    """Shared 'Key Risk Factors' block for the board expander and the
+    predict tab - one code path instead of two near-identical loops"""
+    if not risk_factors:
+        return
+    for i, (feature, value, direction, impact) in enumerate(
+        format_risk_factors(encounter_id, risk_factors), 1
+    ):
+        arrow = "⬆️" if direction == "increases" else "⬇️"
+        st.write(f"{i}. **{feature}**: {value:.1f} {arrow} (Impact: {abs(impact):.3f})")
+
+
 def logout():
     """Clear session"""
     st.session_state.token = None
     st.session_state.username = None
 
 
+# Fragments: a click inside a card (View / Close / Done) reruns just that
+# card instead of the whole script, so no refetch of the board, tasks, or
+# health probe per interaction.
+
+@st.fragment
+def render_patient_card(patient, idx, details):
+    """One patient card on the risk board"""
+    risk_level = patient.get("risk_level", "low")
+    risk_score = patient.get("risk_score", 0)
+    patient_id = patient.get('patient_id')
+
+    # Color coding based on risk
+    if risk_level == "high":
+        card_color = "🔴"
+    elif risk_level == "medium":
+        card_color = "🟡"
+    else:
+        card_color = "🟢"
+
+    with st.container():
+        col_card, col_btn = st.columns([7, 1])
+
+        with col_card:
+            # One HTML block instead of columns + caption + writes: a
+            # single websocket message per card instead of ~7
+            st.markdown(
+                "<div style='display:flex;justify-content:space-between;"
+                "align-items:center;padding:0.4rem 0;"
+                "border-bottom:1px solid rgba(128,128,128,0.3)'>"
+                f"<span><b>{card_color} {patient.get('first_name')} {patient.get('last_name')}</b>"
+                f"<br><small>Patient ID: {patient_id}</small></span>"
+                f"<span>Risk: <b>{risk_score*100:.1f}%</b></span>"
+                f"<span>Level: <b>{risk_level.upper()}</b></span>"
+                "</div>",
+                unsafe_allow_html=True,
+            )
+
+        with col_btn:
+            # Use unique key with index to avoid duplicates
+            if st.button("📋 View", key=f"view_patient_{patient_id}_{idx}", use_container_width=True):
+                st.session_state[f'show_detail_{patient_id}'] = True
+
+        # Show patient details if View button was clicked
+        if st.session_state.get(f'show_detail_{patient_id}', False):
+            with st.expander("👤 **Patient Details**", expanded=True):
+                # Details were prefetched above
+                try:
+                    detail_data = details.get(patient.get("encounter_id"))
+
+                    if detail_data is not None:
+                        # Patient info
+                        col_a, col_b, col_c = st.columns(3)
+                        with col_a:
+                            st.metric("Patient ID", patient_id)
+                        with col_b:
+                            st.metric("Risk Score", f"{risk_score*100:.1f}%")
+                        with col_c:
+                            st.metric("Risk Level", risk_level.upper())
+
+                        st.divider()
+
+                        # Risk factors
+                        st.write("**📊 Key Risk Factors:**")
+                        render_factors(
+                            patient.get("encounter_id"),
+                            detail_data.get('risk_factors', []),
+                        )
+
+                        st.divider()
+
+                        # Close button
+                        if st.button("❌ Close Details", key=f"close_{patient_id}_{idx}"):
+                            st.session_state[f'show_detail_{patient_id}'] = False
+                            st.rerun(scope="fragment")
+                    else:
+                        st.warning("⚠️ Could not load detailed information")
+                except Exception as e:
+                    st.error(f"Error loading details: {e}")
+
+
+@st.fragment
+def render_task(task):
+    """One task card on the task board"""
+    task_id = task.get('task_id') or task.get('id')
+    status = task.get("status", "unknown")
+
+    if status == "open":
+        badge = "<span style='color:#e6a700'>📌 OPEN</span>"
+    elif status == "in_progress":
+        badge = "<span style='color:#1c83e1'>⏳ IN PROGRESS</span>"
+    else:
+        badge = "<span style='color:#21a366'>✅ COMPLETED</span>"
+
+    with st.container():
+        col_card, col_btn = st.columns([7, 1])
+
+        with col_card:
+            # Same one-HTML-block layout as the patient cards
+            st.markdown(
+                "<div style='display:flex;justify-content:space-between;"
+                "align-items:center;padding:0.4rem 0;"
+                "border-bottom:1px solid rgba(128,128,128,0.3)'>"
+                f"<span><b>{task.get('task_type', 'Task')}</b>"
+                f"<br><small>Patient ID: {task.get('patient_id')} | Task #{task_id}</small></span>"
+                f"<span><b>{badge}</b></span>"
+                "</div>",
+                unsafe_allow_html=True,
+            )
+
+        with col_btn:
+            if status in ["open", "in_progress"]:
+                if st.button("✅ Done", key=f"complete_{task_id}", use_container_width=True):
+                    complete_response = http().post(
+                        f"{API_BASE}/ward/tasks/{task_id}/complete",
+                        headers=get_headers(),
+                    )
+                    if complete_response.status_code == 200:
+                        st.success("Task completed!")
+                        fetch_ward_tasks.clear()
+                        # Full rerun: the open/completed metrics live
+                        # outside this fragment
+                        st.rerun()
+                    else:
+                        st.error("Failed to complete")
+
+
 # ===== LOGIN PAGE =====
 if not st.session_state.token:
     # Center the login form
@@ -107,6 +346,7 @@ else:
             )
         with col3:
             if st.button("🔄 Refresh", use_container_width=True):
+                fetch_ward_risk.clear()
                 st.rerun()
 
         # Map display names to API values
@@ -117,120 +357,73 @@ else:
             "Low Risk Only": "low"
         }
         
+        # One page of cards per rerun: widget count stays O(page size) no
+        # matter how big the ward grows
+        PAGE_SIZE = 20
+        if st.session_state.get("ward_filter") != risk_filter:
+            st.session_state.ward_filter = risk_filter
+            st.session_state.ward_page = 0
+        page = st.session_state.setdefault("ward_page", 0)
+
         try:
-            params = {}
-            if filter_map[risk_filter]:
-                params["min_level"] = filter_map[risk_filter]
-            
-            response = requests.get(
-                f"{API_BASE}/ward/risk",
-                headers=get_headers(),
-                params=params,
+            status_code, patients = fetch_ward_risk(
+                filter_map[risk_filter],
+                st.session_state.token,
+                limit=PAGE_SIZE,
+                offset=page * PAGE_SIZE,
             )
 
-            if response.status_code == 200:
-                patients = response.json()
-
+            if status_code == 200:
                 if patients:
-                    # Summary metrics at top
+                    # Summary metrics at top - one pass over the list
+                    # instead of a comprehension per level
+                    level_counts = Counter(p.get("risk_level", "low") for p in patients)
+
                     col1, col2, col3 = st.columns(3)
                     with col1:
                         st.metric("📋 Total Patients", len(patients))
                     with col2:
-                        high_risk = len([p for p in patients if p.get("risk_level") == "high"])
-                        st.metric("🔴 High Risk", high_risk)
+                        st.metric("🔴 High Risk", level_counts.get("high", 0))
                     with col3:
-                        medium_risk = len([p for p in patients if p.get("risk_level") == "medium"])
-                        st.metric("🟡 Medium Risk", medium_risk)
+                        st.metric("🟡 Medium Risk", level_counts.get("medium", 0))
 
                     st.divider()
 
-                    # Display patient cards (simpler than table)
+                    # Prefetch details for the whole page in one batched
+                    # server call before the render loop
+                    page_ids = tuple(
+                        p.get("encounter_id")
+                        for p in patients
+                        if p.get("encounter_id") is not None
+                    )
+                    details = (
+                        fetch_details_batch(page_ids, st.session_state.token)
+                        if page_ids else {}
+                    )
+
+                    # Display patient cards (simpler than table); each card
+                    # is a fragment so clicks rerun only that card
                     for idx, patient in enumerate(patients):
-                        risk_level = patient.get("risk_level", "low")
-                        risk_score = patient.get("risk_score", 0)
-                        patient_id = patient.get('patient_id')
-                        
-                        # Color coding based on risk
-                        if risk_level == "high":
-                            card_color = "🔴"
-                        elif risk_level == "medium":
-                            card_color = "🟡"
-                        else:
-                            card_color = "🟢"
-
-                        with st.container():
-                            col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                            
-                            with col1:
-                                st.markdown(f"**{card_color} {patient.get('first_name')} {patient.get('last_name')}**")
-                                st.caption(f"Patient ID: {patient_id}")
-                            
-                            with col2:
-                                st.write(f"Risk: **{risk_score*100:.1f}%**")
-                            
-                            with col3:
-                                st.write(f"Level: **{risk_level.upper()}**")
-                            
-                            with col4:
-                                # Use unique key with index to avoid duplicates
-                                if st.button("📋 View", key=f"view_patient_{patient_id}_{idx}", use_container_width=True):
-                                    st.session_state[f'show_detail_{patient_id}'] = True
-                            
-                            # Show patient details if View button was clicked
-                            if st.session_state.get(f'show_detail_{patient_id}', False):
-                                with st.expander("👤 **Patient Details**", expanded=True):
-                                    # Fetch detailed patient info
-                                    try:
-                                        detail_response = requests.get(
-                                            f"{API_BASE}/predict/readmission/{patient.get('encounter_id', 1)}",
-                                            headers=get_headers(),
-                                        )
-                                        
-                                        if detail_response.status_code == 200:
-                                            detail_data = detail_response.json()
-                                            
-                                            # Patient info
-                                            col_a, col_b, col_c = st.columns(3)
-                                            with col_a:
-                                                st.metric("Patient ID", patient_id)
-                                            with col_b:
-                                                st.metric("Risk Score", f"{risk_score*100:.1f}%")
-                                            with col_c:
-                                                st.metric("Risk Level", risk_level.upper())
-                                            
-                                            st.divider()
-                                            
-                                            # Risk factors
-                                            st.write("**📊 Key Risk Factors:**")
-                                            risk_factors = detail_data.get('risk_factors', [])
-                                            
-                                            if risk_factors:
-                                                for i, factor in enumerate(risk_factors[:5], 1):
-                                                    feature = factor['feature'].replace('_', ' ').title()
-                                                    value = factor['value']
-                                                    impact = factor['impact']
-                                                    direction = "⬆️" if factor['direction'] == "increases" else "⬇️"
-                                                    
-                                                    st.write(f"{i}. **{feature}**: {value:.1f} {direction} (Impact: {abs(impact):.3f})")
-                                            
-                                            st.divider()
-                                            
-                                            # Close button
-                                            if st.button("❌ Close Details", key=f"close_{patient_id}_{idx}"):
-                                                st.session_state[f'show_detail_{patient_id}'] = False
-                                                st.rerun()
-                                        else:
-                                            st.warning("⚠️ Could not load detailed information")
-                                    except Exception as e:
-                                        st.error(f"Error loading details: {e}")
-                            
-                            st.divider()
+                        render_patient_card(patient, idx, details)
 
                 else:
                     st.info("ℹ️ No patients found with selected filter")
+
+                # Pagination controls
+                col_prev, col_page, col_next = st.columns([1, 2, 1])
+                with col_prev:
+                    if st.button("⬅️ Previous", disabled=page == 0, use_container_width=True):
+                        st.session_state.ward_page = page - 1
+                        st.rerun()
+                with col_page:
+                    st.caption(f"Page {page + 1}")
+                with col_next:
+                    more = patients is not None and len(patients) == PAGE_SIZE
+                    if st.button("Next ➡️", disabled=not more, use_container_width=True):
+                        st.session_state.ward_page = page + 1
+                        st.rerun()
             else:
-                st.error(f"❌ Error loading patients: {response.status_code}")
+                st.error(f"❌ Error loading patients: {status_code}")
         except Exception as e:
             st.error(f"❌ Connection error: {e}")
 
@@ -250,6 +443,7 @@ else:
             )
         with col2:
             if st.button("🔄 Refresh", use_container_width=True, key="refresh_tasks"):
+                fetch_ward_tasks.clear()
                 st.rerun()
 
         # Map to API values
@@ -260,19 +454,11 @@ else:
         }
 
         try:
-            params = {}
-            if status_map[task_filter]:
-                params["status_filter"] = status_map[task_filter]
-            
-            response = requests.get(
-                f"{API_BASE}/ward/tasks",
-                headers=get_headers(),
-                params=params,
+            status_code, tasks = fetch_ward_tasks(
+                status_map[task_filter], st.session_state.token
             )
 
-            if response.status_code == 200:
-                tasks = response.json()
-
+            if status_code == 200:
                 if tasks:
                     # Task summary
                     open_count = len([t for t in tasks if t.get("status") == "open"])
@@ -286,45 +472,14 @@ else:
 
                     st.divider()
 
-                    # Display tasks as simple cards
+                    # Display tasks as simple cards; each card is a
+                    # fragment so clicks rerun only that card
                     for task in tasks:
-                        task_id = task.get('task_id') or task.get('id')
-                        status = task.get("status", "unknown")
-                        
-                        with st.container():
-                            col1, col2, col3 = st.columns([3, 2, 1])
-
-                            with col1:
-                                task_type = task.get('task_type', 'Task')
-                                st.markdown(f"**{task_type}**")
-                                st.caption(f"Patient ID: {task.get('patient_id')} | Task #{task_id}")
-
-                            with col2:
-                                if status == "open":
-                                    st.warning("📌 OPEN")
-                                elif status == "in_progress":
-                                    st.info("⏳ IN PROGRESS")
-                                else:
-                                    st.success("✅ COMPLETED")
-
-                            with col3:
-                                if status in ["open", "in_progress"]:
-                                    if st.button("✅ Done", key=f"complete_{task_id}", use_container_width=True):
-                                        complete_response = requests.post(
-                                            f"{API_BASE}/ward/tasks/{task_id}/complete",
-                                            headers=get_headers(),
-                                        )
-                                        if complete_response.status_code == 200:
-                                            st.success("Task completed!")
-                                            st.rerun()
-                                        else:
-                                            st.error("Failed to complete")
-
-                            st.divider()
+                        render_task(task)
                 else:
                     st.info("ℹ️ No tasks found")
             else:
-                st.error(f"❌ Error loading tasks: {response.status_code}")
+                st.error(f"❌ Error loading tasks: {status_code}")
         except Exception as e:
             st.error(f"❌ Connection error: {e}")
 
@@ -354,14 +509,11 @@ else:
         if predict_btn:
             try:
                 with st.spinner("Analyzing patient data..."):
-                    response = requests.get(
-                        f"{API_BASE}/predict/readmission/{encounter_id}",
-                        headers=get_headers(),
+                    status_code, data = get_prediction(
+                        encounter_id, st.session_state.token
                     )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    
+                if status_code == 200:
                     st.success("✅ Analysis Complete")
                     st.divider()
 
@@ -385,24 +537,10 @@ else:
 
                     st.divider()
 
-                    # Key risk factors in simple language
+                    # Key risk factors - same block as the board expander
                     st.subheader("📋 Main Risk Factors")
-                    risk_factors = data.get('risk_factors', [])
-                    
-                    if risk_factors:
-                        # Show top 5 factors only
-                        for i, factor in enumerate(risk_factors[:5], 1):
-                            feature = factor['feature'].replace('_', ' ').title()
-                            value = factor['value']
-                            direction = "⬆️ Increases" if factor['direction'] == "increases" else "⬇️ Decreases"
-                            
-                            with st.expander(f"**{i}. {feature}** - Value: {value:.1f}", expanded=(i <= 3)):
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.metric("Current Value", f"{value:.1f}")
-                                with col2:
-                                    st.write(f"**Effect:** {direction} risk")
-                    
+                    render_factors(encounter_id, data.get('risk_factors', []))
+
                     st.divider()
                     
                     # Action buttons for nurses
@@ -417,10 +555,10 @@ else:
                         if st.button("👨‍⚕️ Notify Doctor", use_container_width=True):
                             st.info("Notification feature coming soon")
 
-                elif response.status_code == 404:
+                elif status_code == 404:
                     st.error("❌ Encounter not found. Please check the ID and try again.")
                 else:
-                    st.error(f"❌ Error: {response.status_code}")
+                    st.error(f"❌ Error: {status_code}")
             except Exception as e:
                 st.error(f"❌ Connection error: {e}")
 
@@ -429,14 +567,13 @@ else:
 with st.sidebar:
     st.header("🏥 System Status")
     
-    # API health check
-    try:
-        health = requests.get(f"{API_BASE}/predict/readmission/1", timeout=2)
-        if health.status_code in [200, 404]:
-            st.success("✅ Connected")
-        else:
-            st.warning("⚠️ Connection Issue")
-    except:
+    # API health check (cached; hits /health instead of running a prediction)
+    health_status = ping()
+    if health_status == 200:
+        st.success("✅ Connected")
+    elif health_status is not None:
+        st.warning("⚠️ Connection Issue")
+    else:
         st.error("❌ Offline")
     
     st.divider()